@@ -4,22 +4,42 @@ from pydantic import BaseModel
 from typing import List, Optional, Dict, Any
 import asyncio
 import json
-import tempfile
 import os
+import sys
 import subprocess
 import time
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import asynccontextmanager
 from pathlib import Path
 
 from app.services.security_scanner import SecurityScanner
 from app.services.code_validator import CodeValidator
 from app.services.confidence_scorer import ConfidenceScorer
 from app.models.validation_models import ValidationRequest, ValidationResponse
-from app.utils.file_handler import FileHandler
+from app.utils.file_handler import FileHandler, FileTooLargeError, MAGIC_BYTES
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    configure_scratch_dir()
+    # Shared pool so AST parsing and regex scans don't hold the event loop's GIL.
+    # Workers start lazily, after the loop's worker threads exist, so they come
+    # from a forkserver rather than forking this multi-threaded process
+    code_validator.executor = ProcessPoolExecutor(
+        max_workers=os.cpu_count(),
+        mp_context=multiprocessing.get_context("forkserver")
+    )
+    try:
+        yield
+    finally:
+        code_validator.executor.shutdown(wait=True)
+        code_validator.executor = None
 
 app = FastAPI(
     title="Viera Protocol - AI Validation Service",
     description="Local AI validation service for research submissions",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan
 )
 
 # Enable CORS for local development
@@ -31,12 +51,25 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Read size for streaming uploads to disk
+UPLOAD_CHUNK_SIZE = 64 * 1024
+
+# Set USE_EXTERNAL_LINTERS=1 to lint Python with flake8/bandit (in the process
+# pool) instead of the built-in AST checks
+USE_EXTERNAL_LINTERS = os.getenv("USE_EXTERNAL_LINTERS", "").strip().lower() in ("1", "true", "yes", "on")
+
 # Initialize services
 security_scanner = SecurityScanner()
-code_validator = CodeValidator()
+code_validator = CodeValidator(use_external_linters=USE_EXTERNAL_LINTERS)
 confidence_scorer = ConfidenceScorer()
 file_handler = FileHandler()
 
+def configure_scratch_dir():
+    """Let uploads use RAM-backed /dev/shm; FileHandler falls back to disk per file when it's full"""
+    shm = '/dev/shm'
+    if sys.platform.startswith('linux') and os.path.isdir(shm) and os.access(shm, os.W_OK):
+        file_handler.use_scratch_dir(shm)
+
 @app.get("/")
 async def root():
     return {
@@ -53,7 +86,7 @@ async def health_check():
     """Health check endpoint"""
     try:
         # Check if ClamAV is running
-        clamav_status = security_scanner.check_antivirus_status()
+        clamav_status = await security_scanner.check_antivirus_status()
         
         return {
             "status": "healthy",
@@ -86,15 +119,20 @@ async def validate_submission(
         if not files:
             raise HTTPException(status_code=400, detail="No files provided")
         
-        # Process files
-        processed_files = []
+        # Process files concurrently so independent scans and linters overlap; if
+        # one file fails, cancel the rest rather than leaving them running
+        tasks = [asyncio.create_task(process_single_file(file, researcher_type)) for file in files]
+        try:
+            processed_files = await asyncio.gather(*tasks)
+        except BaseException:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            raise
         overall_scores = {"security": 0, "technical_quality": 0, "originality": 0, "completeness": 0}
         all_issues = []
-        
-        for file in files:
-            file_result = await process_single_file(file, researcher_type)
-            processed_files.append(file_result)
-            
+
+        for file_result in processed_files:
             # Aggregate scores
             for key in overall_scores:
                 overall_scores[key] += file_result["scores"][key]
@@ -114,66 +152,76 @@ async def validate_submission(
         
         processing_time = round((time.time() - validation_start_time) * 1000, 2)
         
-        return ValidationResponse(
-            validation_id=f"val_{submission_id}_{int(time.time())}",
-            overall_confidence=overall_confidence,
-            security_passed=overall_scores["security"] >= 70,
-            detailed_scores=overall_scores,
-            issues_found=all_issues,
-            recommendation=recommendation,
-            processing_time_ms=processing_time,
-            files_processed=num_files
-        )
+        # Returned as a dict: the response_model validates and serializes it once,
+        # instead of validating a ValidationResponse here and again on the way out
+        return {
+            "validation_id": f"val_{submission_id}_{int(time.time())}",
+            "overall_confidence": overall_confidence,
+            "security_passed": overall_scores["security"] >= 70,
+            "detailed_scores": overall_scores,
+            "issues_found": all_issues,
+            "recommendation": recommendation,
+            "processing_time_ms": processing_time,
+            "files_processed": num_files
+        }
         
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Validation failed: {str(e)}")
 
 async def process_single_file(file: UploadFile, researcher_type: str) -> Dict[str, Any]:
     """Process a single uploaded file"""
     
-    with tempfile.NamedTemporaryFile(delete=False, suffix=f"_{file.filename}") as temp_file:
-        try:
-            # Save uploaded file
-            content = await file.read()
-            temp_file.write(content)
-            temp_file.flush()
-            
-            file_path = temp_file.name
-            file_info = {
-                "name": file.filename,
-                "size": len(content),
-                "type": file.content_type or "unknown"
-            }
-            
-            # Security scan
-            security_result = await security_scanner.scan_file(file_path, file_info)
-            
-            # Code validation (if applicable)
-            validation_result = {"score": 0, "issues": []}
-            if researcher_type == "coder":
-                validation_result = await code_validator.validate_code_file(file_path, file_info)
-            
-            # Calculate scores
-            scores = {
-                "security": security_result["score"],
-                "technical_quality": validation_result["score"],
-                "originality": 85,  # Placeholder - would integrate plagiarism check
-                "completeness": 80   # Placeholder - would check against milestone requirements
-            }
-            
-            # Combine issues
-            issues = security_result["issues"] + validation_result["issues"]
-            
-            return {
-                "file_info": file_info,
-                "scores": scores,
-                "issues": issues
-            }
-            
-        finally:
-            # Cleanup temp file
-            if os.path.exists(temp_file.name):
-                os.unlink(temp_file.name)
+    async def upload_chunks():
+        while chunk := await file.read(UPLOAD_CHUNK_SIZE):
+            yield chunk
+    
+    # Stream the upload to disk in fixed-size chunks instead of buffering it,
+    # rejecting it as soon as it passes the size limit
+    try:
+        saved = await file_handler.save_uploaded_stream(upload_chunks(), file.filename)
+    except FileTooLargeError as e:
+        raise HTTPException(status_code=413, detail=str(e))
+    file_path = saved["path"]
+    
+    try:
+        file_info = {
+            "name": file.filename,
+            "size": saved["size"],
+            "type": file.content_type or "unknown",
+            # Leading bytes for the scanner's signature check, so it needn't re-read the file
+            "magic": saved["magic"]
+        }
+        
+        # Security scan
+        security_result = await security_scanner.scan_file(file_path, file_info)
+        
+        # Code validation (if applicable)
+        validation_result = {"score": 0, "issues": []}
+        if researcher_type == "coder":
+            validation_result = await code_validator.validate_code_file(file_path, file_info)
+        
+        # Calculate scores
+        scores = {
+            "security": security_result["score"],
+            "technical_quality": validation_result["score"],
+            "originality": 85,  # Placeholder - would integrate plagiarism check
+            "completeness": 80   # Placeholder - would check against milestone requirements
+        }
+        
+        # Combine issues
+        issues = security_result["issues"] + validation_result["issues"]
+        
+        return {
+            "file_info": file_info,
+            "scores": scores,
+            "issues": issues
+        }
+        
+    finally:
+        # Cleanup temp file
+        file_handler.cleanup_temp_file(file_path)
 
 def get_recommendation(confidence: int, issues: List[Dict]) -> str:
     """Determine validation recommendation based on confidence and issues"""
@@ -201,45 +249,56 @@ async def validate_code_only(
         if language not in ["python", "javascript"]:
             raise HTTPException(status_code=400, detail="Unsupported language")
         
-        # Create temporary file with code content
-        with tempfile.NamedTemporaryFile(mode='w', delete=False, suffix=f".{get_extension(language)}") as temp_file:
-            temp_file.write(code_content)
-            temp_file.flush()
+        # Write the code through the file handler so it lands in the scratch
+        # dir (with its space reservation) like uploaded files do
+        extension = f".{get_extension(language)}"
+        content = code_content.encode('utf-8')
+        try:
+            file_path = await file_handler.save_uploaded_file(
+                content, filename if filename.endswith(extension) else filename + extension
+            )
+        except FileTooLargeError as e:
+            raise HTTPException(status_code=413, detail=str(e))
+        
+        file_info = {
+            "name": filename,
+            "size": len(content),
+            "type": f"text/{language}",
+            "magic": content[:MAGIC_BYTES]
+        }
+        
+        try:
+            # Security scan
+            security_result = await security_scanner.scan_file(file_path, file_info)
+            
+            # Code validation runs on the submitted source; the saved file is only
+            # reused by linters that need a path
+            validation_result = await code_validator.validate_code_string(
+                code_content, language, file_info, file_path
+            )
             
-            file_info = {
-                "name": filename,
-                "size": len(code_content),
-                "type": f"text/{language}"
+            scores = {
+                "security": security_result["score"],
+                "technical_quality": validation_result["score"],
+                "originality": 85,
+                "completeness": 80
             }
             
-            try:
-                # Security scan
-                security_result = await security_scanner.scan_file(temp_file.name, file_info)
-                
-                # Code validation
-                validation_result = await code_validator.validate_code_file(temp_file.name, file_info)
-                
-                scores = {
-                    "security": security_result["score"],
-                    "technical_quality": validation_result["score"],
-                    "originality": 85,
-                    "completeness": 80
-                }
-                
-                overall_confidence = confidence_scorer.calculate_overall_confidence(scores)
-                issues = security_result["issues"] + validation_result["issues"]
-                
-                return {
-                    "confidence": overall_confidence,
-                    "scores": scores,
-                    "issues": issues,
-                    "recommendation": get_recommendation(overall_confidence, issues)
-                }
+            overall_confidence = confidence_scorer.calculate_overall_confidence(scores)
+            issues = security_result["issues"] + validation_result["issues"]
+            
+            return {
+                "confidence": overall_confidence,
+                "scores": scores,
+                "issues": issues,
+                "recommendation": get_recommendation(overall_confidence, issues)
+            }
+            
+        finally:
+            file_handler.cleanup_temp_file(file_path)
                 
-            finally:
-                if os.path.exists(temp_file.name):
-                    os.unlink(temp_file.name)
-                    
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Code validation failed: {str(e)}")
 
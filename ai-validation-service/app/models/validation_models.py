@@ -11,7 +11,7 @@ class ValidationRequest(BaseModel):
     submission_id: str = Field(..., description="Unique submission identifier")
     researcher_type: str = Field(..., description="Type of researcher: coder, researcher, data_scientist")
     files: List[FileInfo] = Field(..., description="List of files to validate")
-    milestone_requirements: Dict[str, Any] = Field(default={}, description="Milestone-specific requirements")
+    milestone_requirements: Dict[str, Any] = Field(default_factory=dict, description="Milestone-specific requirements")
 
 class ValidationIssue(BaseModel):
     severity: str = Field(..., description="Issue severity: error, warning, info")
@@ -1,34 +1,376 @@
-import subprocess
+import asyncio
 import os
-import json
+import orjson
 import ast
 import re
+import hashlib
+import io
+import shutil
+import contextlib
+import signal
+from collections import Counter, OrderedDict
+from importlib import metadata
 from typing import Dict, List, Any
 import tempfile
 from pathlib import Path
 
-class CodeValidator:
+# Names bandit treats as likely credentials (B105/B106): the words only count as
+# whole identifier segments, so e.g. 'compass' or 'tokenizer' don't match
+_PASSWORD_WORDS = r'(pas+wo?r?d|pass(phrase)?|pwd|token|secrete?)'
+_PASSWORD_NAME_RE = re.compile(
+    rf'(^{_PASSWORD_WORDS}$|_{_PASSWORD_WORDS}_|^{_PASSWORD_WORDS}_|_{_PASSWORD_WORDS}$)',
+    re.IGNORECASE
+)
+
+# Call/import name -> bandit test ID, so each finding reports the same ID bandit would
+_DESERIALIZATION_CALLS = {
+    'pickle.load': 'B301', 'pickle.loads': 'B301', 'cPickle.load': 'B301', 'cPickle.loads': 'B301',
+    'marshal.load': 'B302', 'marshal.loads': 'B302',
+}
+_SHELL_CALLS = {'os.system', 'os.popen'}
+_FLAGGED_IMPORTS = {
+    'pickle': 'B403', 'cPickle': 'B403', 'dill': 'B403', 'shelve': 'B403',
+    'subprocess': 'B404',
+}
+
+# Common JavaScript security issues, matched in one pass; group name -> (message, severity)
+_JS_SECURITY_RE = re.compile(
+    r'(?P<eval>eval\s*\()'
+    r'|(?P<innerhtml>innerHTML\s*=)'
+    r'|(?P<docwrite>document\.write\s*\()'
+    r'|(?P<settimeout>setTimeout\s*\(\s*["\'])'
+    r'|(?P<setinterval>setInterval\s*\(\s*["\'])',
+    re.IGNORECASE
+)
+_JS_SECURITY_META = {
+    'eval': ("Use of eval() detected", "error"),
+    'innerhtml': ("Potential XSS with innerHTML", "warning"),
+    'docwrite': ("Use of document.write detected", "warning"),
+    'settimeout': ("setTimeout with string argument", "warning"),
+    'setinterval': ("setInterval with string argument", "warning")
+}
+
+# flake8 report layout parsed by CodeValidator._run_flake8
+FLAKE8_FORMAT = '--format=%(row)d:%(col)d:%(code)s:%(text)s'
+
+# Extra seconds the event loop waits past a pool job's own deadline
+POOL_TIMEOUT_GRACE = 5
+
+# Docstring fallback for Python sources that fail to parse
+_PY_DOCSTRING_RE = re.compile(r'""".*?"""', re.DOTALL)
+
+
+def _call_name(node: ast.AST) -> str:
+    """Return the dotted name of a call target, e.g. 'os.system'"""
+    parts = []
+    while isinstance(node, ast.Attribute):
+        parts.append(node.attr)
+        node = node.value
+    if isinstance(node, ast.Name):
+        parts.append(node.id)
+    return ".".join(reversed(parts))
+
+
+class PythonSourceVisitor:
+    """
+    Single AST walk covering the flake8/bandit rules we consume plus structure counts.
+    The walk is iterative: valid code can nest deeper (e.g. long string concatenations)
+    than a recursive ast.NodeVisitor can follow without hitting the recursion limit
+    """
     def __init__(self):
+        self.security_issues = []
+        self.quality_issues = []
+        self.function_count = 0
+        self.class_count = 0
+        self.docstring_count = 0
+    
+    def visit(self, tree: ast.AST):
+        """Pre-order walk with an explicit stack, dispatching to visit_<NodeType> handlers"""
+        stack = [tree]
+        while stack:
+            node = stack.pop()
+            handler = getattr(self, f"visit_{type(node).__name__}", None)
+            if handler is not None:
+                handler(node)
+            stack.extend(reversed(list(ast.iter_child_nodes(node))))
+    
+    def _security(self, node: ast.AST, test_id: str, severity: str, message: str):
+        self.security_issues.append({
+            "severity": severity,
+            "message": message,
+            "line": getattr(node, 'lineno', None),
+            "rule": f"ast-{test_id}"
+        })
+    
+    def _quality(self, node: ast.AST, code: str, severity: str, message: str):
+        self.quality_issues.append({
+            "severity": severity,
+            "message": f"{code}: {message}",
+            "line": getattr(node, 'lineno', None),
+            "rule": "python_quality"
+        })
+    
+    def _check_credential(self, node: ast.AST, name: str, value: ast.AST, test_id: str):
+        if (name and _PASSWORD_NAME_RE.search(name)
+                and isinstance(value, ast.Constant) and isinstance(value.value, str) and value.value):
+            self._security(node, test_id, "info", f"Possible hardcoded password: '{name}'")
+    
+    def _shell_severity(self, node: ast.Call) -> str:
+        """Like bandit: a literal command string is LOW (info), anything built at runtime HIGH (error)"""
+        if node.args and isinstance(node.args[0], ast.Constant) and isinstance(node.args[0].value, str):
+            return "info"
+        return "error"
+    
+    def visit_Call(self, node: ast.Call):
+        name = _call_name(node.func)
+        keywords = {kw.arg: kw.value for kw in node.keywords if kw.arg}
+        
+        if name == 'eval':
+            self._security(node, 'B307', "warning", "Use of possibly insecure function eval()")
+        elif name == 'exec':
+            self._security(node, 'B102', "warning", "Use of exec detected")
+        elif name in _DESERIALIZATION_CALLS:
+            self._security(node, _DESERIALIZATION_CALLS[name], "warning", f"Deserialization of untrusted data with {name}()")
+        elif name == 'yaml.load' and 'Loader' not in keywords and len(node.args) < 2:
+            self._security(node, 'B506', "warning", "Use of unsafe yaml.load() without a Loader")
+        elif name in _SHELL_CALLS:
+            self._security(node, 'B605', self._shell_severity(node), f"Starting a process with a shell: {name}()")
+        elif name.startswith('subprocess.'):
+            shell = keywords.get('shell')
+            if isinstance(shell, ast.Constant) and shell.value:
+                self._security(node, 'B602', self._shell_severity(node), f"{name}() call with shell=True")
+        
+        for arg, value in keywords.items():
+            self._check_credential(node, arg, value, 'B106')
+    
+    def visit_Import(self, node: ast.Import):
+        for alias in node.names:
+            test_id = _FLAGGED_IMPORTS.get(alias.name.split('.')[0])
+            if test_id:
+                self._security(node, test_id, "info", f"Consider possible security implications of importing {alias.name}")
+    
+    def visit_ImportFrom(self, node: ast.ImportFrom):
+        module = node.module or ""
+        test_id = _FLAGGED_IMPORTS.get(module.split('.')[0])
+        if test_id:
+            self._security(node, test_id, "info", f"Consider possible security implications of importing {module}")
+        if any(alias.name == '*' for alias in node.names):
+            self._quality(node, 'F403', "error", f"'from {module} import *' used; unable to detect undefined names")
+    
+    def visit_Assign(self, node: ast.Assign):
+        for target in node.targets:
+            if isinstance(target, ast.Name):
+                self._check_credential(node, target.id, node.value, 'B105')
+            elif isinstance(target, ast.Attribute):
+                self._check_credential(node, target.attr, node.value, 'B105')
+    
+    def visit_ExceptHandler(self, node: ast.ExceptHandler):
+        if node.type is None:
+            self._quality(node, 'E722', "warning", "do not use bare 'except'")
+    
+    def visit_Compare(self, node: ast.Compare):
+        for op, comparator in zip(node.ops, node.comparators):
+            if (isinstance(op, (ast.Eq, ast.NotEq))
+                    and isinstance(comparator, ast.Constant) and comparator.value is None):
+                self._quality(node, 'E711', "warning", "comparison to None should use 'is' or 'is not'")
+    
+    def visit_FunctionDef(self, node: ast.FunctionDef):
+        self.function_count += 1
+        if ast.get_docstring(node) is not None:
+            self.docstring_count += 1
+    
+    visit_AsyncFunctionDef = visit_FunctionDef
+    
+    def visit_ClassDef(self, node: ast.ClassDef):
+        self.class_count += 1
+        if ast.get_docstring(node) is not None:
+            self.docstring_count += 1
+
+
+def analyze_python_source(source: str) -> Dict[str, Any]:
+    """
+    Parse Python source once and collect syntax, quality, security and structure data
+    """
+    try:
+        tree = ast.parse(source)
+    except SyntaxError as e:
+        return {"syntax": {"valid": False, "error": str(e), "line": e.lineno}}
+    except Exception as e:
+        return {"syntax": {"valid": False, "error": f"Parsing error: {str(e)}"}}
+    
+    visitor = PythonSourceVisitor()
+    visitor.visit(tree)
+    
+    return {
+        "syntax": {"valid": True},
+        "security_issues": visitor.security_issues,
+        "quality_issues": visitor.quality_issues,
+        "function_count": visitor.function_count,
+        "class_count": visitor.class_count,
+        "docstring_count": visitor.docstring_count + (1 if ast.get_docstring(tree) is not None else 0)
+    }
+
+
+def _linter_versions() -> tuple:
+    """Installed flake8/bandit versions, mixed into cache keys so upgrades invalidate results"""
+    versions = []
+    for tool in ('flake8', 'bandit'):
+        try:
+            versions.append(metadata.version(tool))
+        except metadata.PackageNotFoundError:
+            versions.append(None)
+    return tuple(versions)
+
+
+def _source_metrics(source: str, language: str, analysis: Dict = None) -> Dict[str, int]:
+    """Line, comment and documentation counts used by the complexity checks"""
+    # Single pass over the lines for size and comment metrics
+    comment_marker = '#' if language == 'python' else '//'
+    non_empty_lines = 0
+    comment_count = 0
+    block_doc_count = 0
+    
+    for line in source.splitlines():
+        stripped = line.lstrip()
+        if not stripped:
+            continue
+        non_empty_lines += 1
+        if comment_marker in stripped:
+            comment_count += 1
+        if stripped.startswith('/**'):
+            block_doc_count += 1
+    
+    if language == 'python' and analysis and analysis["syntax"]["valid"]:
+        docstring_count = analysis["docstring_count"]
+    elif language == 'python':
+        docstring_count = sum(1 for _ in _PY_DOCSTRING_RE.finditer(source))
+    else:
+        docstring_count = block_doc_count
+    
+    return {
+        "line_count": source.count('\n') + 1,
+        "non_empty_lines": non_empty_lines,
+        "comment_count": comment_count,
+        "docstring_count": docstring_count
+    }
+
+
+def _js_security_matches(source: str) -> List[tuple]:
+    """(message, severity, occurrences) for each JavaScript security pattern found"""
+    counts = Counter(match.lastgroup for match in _JS_SECURITY_RE.finditer(source))
+    return [
+        (message, severity, counts[group])
+        for group, (message, severity) in _JS_SECURITY_META.items()
+        if counts[group]
+    ]
+
+
+def _cpu_pass(source: str, language: str) -> Dict[str, Any]:
+    """
+    All CPU-bound parsing and scanning for one source file. Kept at module
+    level so it can be pickled into a ProcessPoolExecutor.
+    """
+    analysis = analyze_python_source(source) if language == 'python' else None
+    return {
+        "analysis": analysis,
+        "metrics": _source_metrics(source, language, analysis),
+        "js_security": _js_security_matches(source) if language == 'javascript' else []
+    }
+
+
+def _flake8_report(file_path: str) -> str:
+    """
+    Run flake8 in the current process and return its formatted report. Meant
+    for the long-lived pool workers, so flake8 and its plugins load only once.
+    """
+    from flake8.main.application import Application
+    
+    buffer = io.BytesIO()
+    stream = io.TextIOWrapper(buffer, encoding='utf-8')
+    # flake8 writes straight to sys.stdout, so capture it for this call
+    with contextlib.redirect_stdout(stream):
+        Application().run(['--jobs=1', FLAKE8_FORMAT, file_path])
+        stream.flush()
+    return buffer.getvalue().decode('utf-8', errors='replace')
+
+
+def _bandit_results(file_path: str) -> List[Dict[str, Any]]:
+    """Run bandit's scanner in-process, returning issues shaped like its JSON report"""
+    from bandit.core import config, manager
+    
+    bandit_manager = manager.BanditManager(config.BanditConfig(), 'file', quiet=True)
+    bandit_manager.discover_files([file_path])
+    bandit_manager.run_tests()
+    
+    return [{
+        "issue_severity": issue.severity,
+        "issue_text": issue.text,
+        "test_name": issue.test,
+        "test_id": issue.test_id,
+        "line_number": issue.lineno
+    } for issue in bandit_manager.get_issue_list()]
+
+
+def _call_with_deadline(timeout: float, func, *args):
+    """
+    Run func in a pool worker, interrupting it with SIGALRM after timeout seconds
+    so a hung linter frees its worker instead of holding it forever
+    """
+    def expire(signum, frame):
+        raise TimeoutError(f"{func.__name__} exceeded {timeout}s")
+    
+    previous = signal.signal(signal.SIGALRM, expire)
+    signal.setitimer(signal.ITIMER_REAL, timeout)
+    try:
+        return func(*args)
+    finally:
+        signal.setitimer(signal.ITIMER_REAL, 0)
+        signal.signal(signal.SIGALRM, previous)
+
+
+class CodeValidator:
+    def __init__(self, use_external_linters: bool = False):
+        # Python files are analysed in-process by default; flake8/bandit are opt-in
+        self.use_external_linters = use_external_linters
+        # Optional process pool for CPU-bound passes and in-process linters,
+        # assigned by the app at startup
+        self.executor = None
+        # eslint_d keeps a warm eslint daemon; fall back to plain eslint
+        self.eslint_command = 'eslint_d' if shutil.which('eslint_d') else 'eslint'
+        # LRU of validation results keyed by source digest, language and tool versions
+        self.cache_size = 1024
+        self._cache = OrderedDict()
+        self._linter_versions = _linter_versions()
+        # Per-language checkers, picked once here so each stage is a single lookup.
+        # Syntax checkers return {"valid", "error", "line"}; quality and security
+        # checkers return findings with severity/message/line/rule.
         self.supported_languages = {
             'python': {
                 'extensions': ['.py'],
                 'validators': ['pylint', 'flake8', 'bandit'],
-                'syntax_checker': self._check_python_syntax
+                'syntax_checker': self._check_python_syntax,
+                'quality_checker': self._run_flake8 if use_external_linters else self._python_quality_findings,
+                'security_checker': self._run_bandit if use_external_linters else self._python_security_findings
             },
             'javascript': {
                 'extensions': ['.js', '.jsx'],
                 'validators': ['eslint'],
-                'syntax_checker': self._check_javascript_syntax
+                'syntax_checker': self._check_javascript_syntax,
+                'quality_checker': self._run_eslint,
+                'security_checker': self._javascript_security_findings
             }
         }
+        # Extension -> language lookup built once from the table above
+        self._ext_map = {
+            ext: language
+            for language, config in self.supported_languages.items()
+            for ext in config['extensions']
+        }
     
     async def validate_code_file(self, file_path: str, file_info: Dict) -> Dict[str, Any]:
         """
         Comprehensive code validation for a single file
         """
-        issues = []
-        technical_score = 100  # Start with perfect score
-        
         try:
             # Determine language from file extension
             file_extension = os.path.splitext(file_info["name"])[1].lower()
@@ -45,25 +387,74 @@ class CodeValidator:
                     }]
                 }
             
-            # 1. Syntax validation
-            syntax_result = await self._validate_syntax(file_path, language, file_info)
-            issues.extend(syntax_result["issues"])
-            technical_score -= syntax_result["score_deduction"]
+            # Read once; every stage works from this buffer. Undecodable bytes are
+            # replaced so they surface as syntax/quality findings, not a hard failure
+            source = Path(file_path).read_text(encoding='utf-8', errors='replace')
+            
+        except Exception as e:
+            return self._validation_failure(file_info, e)
+        
+        return await self.validate_code_string(source, language, file_info, file_path)
+    
+    async def validate_code_string(self, source: str, language: str, file_info: Dict,
+                                   file_path: str = None) -> Dict[str, Any]:
+        """
+        Validate in-memory source code. The opt-in flake8/bandit linters need a
+        path: file_path is used when given, otherwise a temp file is written.
+        """
+        cache_key = (
+            hashlib.blake2b(source.encode('utf-8', errors='surrogatepass'), digest_size=16).hexdigest(),
+            language,
+            self.use_external_linters,
+            self._linter_versions
+        )
+        
+        cached = self._cache.get(cache_key)
+        if cached is not None:
+            self._cache.move_to_end(cache_key)
+            return self._result_for_file(cached, file_info)
+        
+        result = await self._validate_source(source, language, file_info, file_path)
+        
+        # Timeouts and tool failures are transient, so only clean runs are cached
+        if not any((issue.get("rule") or "").endswith(('_timeout', '_error')) for issue in result["issues"]):
+            self._cache[cache_key] = self._result_for_file(result, file_info)
+            if len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+        
+        return result
+    
+    async def _validate_source(self, source: str, language: str, file_info: Dict,
+                               file_path: str = None) -> Dict[str, Any]:
+        """Run every validation stage on the source"""
+        issues = []
+        technical_score = 100  # Start with perfect score
+        temp_path = None
+        
+        try:
+            if file_path is None and language == 'python' and self.use_external_linters:
+                file_path = temp_path = self._write_temp_source(source, language)
+            
+            # Parsing and regex scans happen once, off the event loop when a pool is set
+            cpu_result = await self._run_in_pool(_cpu_pass, source, language)
             
-            # 2. Code quality analysis
-            quality_result = await self._analyze_code_quality(file_path, language, file_info)
-            issues.extend(quality_result["issues"])
-            technical_score -= quality_result["score_deduction"]
+            # Syntax runs first: deeper analysis of code that doesn't parse only adds noise
+            syntax_result = await self._validate_syntax(source, language, file_info, cpu_result)
             
-            # 3. Security analysis for code
-            security_result = await self._analyze_code_security(file_path, language, file_info)
-            issues.extend(security_result["issues"])
-            technical_score -= security_result["score_deduction"]
+            if syntax_result["syntax_failed"]:
+                stage_results = [syntax_result, await self._analyze_complexity(cpu_result["metrics"], file_info)]
+            else:
+                # Quality, security and complexity are independent, so the linters they
+                # run overlap
+                stage_results = [syntax_result] + list(await asyncio.gather(
+                    self._analyze_code_quality(source, file_path, language, file_info, cpu_result),
+                    self._analyze_code_security(source, file_path, language, file_info, cpu_result),
+                    self._analyze_complexity(cpu_result["metrics"], file_info)
+                ))
             
-            # 4. Complexity and best practices
-            complexity_result = await self._analyze_complexity(file_path, language, file_info)
-            issues.extend(complexity_result["issues"])
-            technical_score -= complexity_result["score_deduction"]
+            for stage_result in stage_results:
+                issues.extend(stage_result["issues"])
+                technical_score -= stage_result["score_deduction"]
             
             # Ensure score doesn't go below 0
             technical_score = max(0, technical_score)
@@ -75,47 +466,116 @@ class CodeValidator:
             }
             
         except Exception as e:
-            return {
-                "score": 0,
-                "issues": [{
-                    "severity": "error",
-                    "message": f"Code validation failed: {str(e)}",
-                    "file": file_info["name"],
-                    "rule": "validation_error"
-                }]
-            }
+            return self._validation_failure(file_info, e)
+        
+        finally:
+            if temp_path and os.path.exists(temp_path):
+                os.unlink(temp_path)
+    
+    def _result_for_file(self, result: Dict[str, Any], file_info: Dict) -> Dict[str, Any]:
+        """Copy of a validation result with its issues attributed to file_info"""
+        return {
+            **result,
+            "issues": [{**issue, "file": file_info["name"]} for issue in result["issues"]]
+        }
+    
+    def _validation_failure(self, file_info: Dict, error: Exception) -> Dict[str, Any]:
+        """Result returned when validation cannot complete"""
+        return {
+            "score": 0,
+            "issues": [{
+                "severity": "error",
+                "message": f"Code validation failed: {str(error)}",
+                "file": file_info["name"],
+                "rule": "validation_error"
+            }]
+        }
+    
+    def _write_temp_source(self, source: str, language: str) -> str:
+        """Materialize source on disk for linters that only accept a path"""
+        suffix = self.supported_languages[language]['extensions'][0]
+        with tempfile.NamedTemporaryFile(mode='w', delete=False, suffix=suffix, encoding='utf-8') as temp_file:
+            temp_file.write(source)
+        return temp_file.name
+    
+    async def _run_in_pool(self, func, *args, timeout: float = None):
+        """
+        Run a picklable module-level function in the configured process pool, or
+        inline when there is none. With a timeout the worker enforces it itself via
+        SIGALRM, so the worker is released; the caller only gives up on its own
+        (leaking the worker) if func is stuck in C code that ignores signals.
+        """
+        if self.executor is None:
+            return func(*args)
+        
+        loop = asyncio.get_running_loop()
+        if timeout is None:
+            return await loop.run_in_executor(self.executor, func, *args)
+        
+        future = loop.run_in_executor(self.executor, _call_with_deadline, timeout, func, *args)
+        return await asyncio.wait_for(future, timeout=timeout + POOL_TIMEOUT_GRACE)
+    
+    async def _run_command(self, args: List[str], timeout: float = 30, input: str = None) -> Dict[str, Any]:
+        """Run an external tool without blocking the event loop"""
+        proc = await asyncio.create_subprocess_exec(
+            *args,
+            stdin=asyncio.subprocess.PIPE if input is not None else None,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE
+        )
+        
+        try:
+            stdout, stderr = await asyncio.wait_for(
+                proc.communicate(input.encode('utf-8') if input is not None else None),
+                timeout=timeout
+            )
+        except BaseException:
+            # Timed out, or the request was cancelled: don't leave the tool running
+            if proc.returncode is None:
+                try:
+                    proc.kill()
+                except ProcessLookupError:
+                    pass
+                await proc.wait()
+            raise
+        
+        return {
+            "returncode": proc.returncode,
+            "stdout": stdout.decode('utf-8', errors='replace'),
+            "stderr": stderr.decode('utf-8', errors='replace')
+        }
     
     def _detect_language(self, file_extension: str) -> str:
         """Detect programming language from file extension"""
-        for language, config in self.supported_languages.items():
-            if file_extension in config['extensions']:
-                return language
-        return None
+        return self._ext_map.get(file_extension)
     
-    async def _validate_syntax(self, file_path: str, language: str, file_info: Dict) -> Dict[str, Any]:
+    async def _validate_syntax(self, source: str, language: str, file_info: Dict, cpu_result: Dict) -> Dict[str, Any]:
         """Validate code syntax"""
         issues = []
         score_deduction = 0
         
         try:
-            config = self.supported_languages[language]
-            syntax_checker = config['syntax_checker']
-            
-            syntax_result = syntax_checker(file_path)
+            syntax_checker = self.supported_languages[language]['syntax_checker']
+            syntax_result = await syntax_checker(source, cpu_result)
             
+            checked = syntax_result.get('checked', True)
             if not syntax_result['valid']:
                 issues.append({
                     "severity": "error",
                     "message": f"Syntax error: {syntax_result['error']}",
                     "file": file_info["name"],
                     "line": syntax_result.get('line'),
-                    "rule": "syntax_validation"
+                    # Checker outages (timeout, missing node) get their own rule so the
+                    # result cache treats them as transient
+                    "rule": "syntax_validation" if checked else "syntax_check_error"
                 })
                 score_deduction = 50  # Major deduction for syntax errors
             
             return {
                 "issues": issues,
-                "score_deduction": score_deduction
+                "score_deduction": score_deduction,
+                # Only a real parse failure short-circuits; checker outages don't
+                "syntax_failed": not syntax_result['valid'] and checked
             }
             
         except Exception as e:
@@ -126,146 +586,66 @@ class CodeValidator:
                     "file": file_info["name"],
                     "rule": "syntax_validation_error"
                 }],
-                "score_deduction": 10
+                "score_deduction": 10,
+                "syntax_failed": False
             }
     
-    def _check_python_syntax(self, file_path: str) -> Dict[str, Any]:
-        """Check Python syntax using AST"""
-        try:
-            with open(file_path, 'r', encoding='utf-8') as f:
-                code = f.read()
-            
-            # Parse with AST
-            ast.parse(code)
-            return {"valid": True}
-            
-        except SyntaxError as e:
-            return {
-                "valid": False,
-                "error": str(e),
-                "line": e.lineno
-            }
-        except Exception as e:
-            return {
-                "valid": False,
-                "error": f"Parsing error: {str(e)}"
-            }
+    async def _check_python_syntax(self, source: str, cpu_result: Dict) -> Dict[str, Any]:
+        """Python syntax comes from the shared AST parse"""
+        return cpu_result["analysis"]["syntax"]
     
-    def _check_javascript_syntax(self, file_path: str) -> Dict[str, Any]:
+    async def _check_javascript_syntax(self, source: str, cpu_result: Dict) -> Dict[str, Any]:
         """Check JavaScript syntax using Node.js"""
         try:
-            # Use Node.js to check syntax
-            result = subprocess.run(
-                ['node', '--check', file_path],
-                capture_output=True,
-                text=True,
-                timeout=10
-            )
+            # Use Node.js to check syntax, feeding the source over stdin
+            result = await self._run_command(['node', '--check', '-'], timeout=10, input=source)
             
-            if result.returncode == 0:
+            if result["returncode"] == 0:
                 return {"valid": True}
             else:
                 return {
                     "valid": False,
-                    "error": result.stderr.strip()
+                    "error": result["stderr"].strip()
                 }
                 
-        except subprocess.TimeoutExpired:
+        except asyncio.TimeoutError:
             return {
                 "valid": False,
+                "checked": False,
                 "error": "Syntax check timed out"
             }
         except FileNotFoundError:
             return {
                 "valid": False,
+                "checked": False,
                 "error": "Node.js not available for syntax checking"
             }
         except Exception as e:
             return {
                 "valid": False,
+                "checked": False,
                 "error": f"Syntax check error: {str(e)}"
             }
     
-    async def _analyze_code_quality(self, file_path: str, language: str, file_info: Dict) -> Dict[str, Any]:
+    async def _analyze_code_quality(self, source: str, file_path: str, language: str, file_info: Dict,
+                                    cpu_result: Dict) -> Dict[str, Any]:
         """Analyze code quality using language-specific tools"""
         issues = []
         score_deduction = 0
         
         try:
-            if language == 'python':
-                # Use Flake8 for Python code quality
-                result = subprocess.run(
-                    ['flake8', '--format=%(path)s:%(row)d:%(col)d:%(code)s:%(text)s', file_path],
-                    capture_output=True,
-                    text=True,
-                    timeout=30
-                )
-                
-                if result.returncode != 0 and result.stdout:
-                    # Parse flake8 output
-                    for line in result.stdout.strip().split('\n'):
-                        if line:
-                            parts = line.split(':')
-                            if len(parts) >= 5:
-                                file_name = parts[0]
-                                line_num = parts[1]
-                                column = parts[2]
-                                code = parts[3]
-                                message = ':'.join(parts[4:]).strip()
-                                
-                                severity = "warning"
-                                if any(error_code in code for error_code in ['E9', 'F']):
-                                    severity = "error"
-                                    score_deduction += 5
-                                else:
-                                    score_deduction += 2
-                                
-                                issues.append({
-                                    "severity": severity,
-                                    "message": f"{code}: {message}",
-                                    "file": file_info["name"],
-                                    "line": int(line_num) if line_num.isdigit() else None,
-                                    "rule": "flake8"
-                                })
+            quality_checker = self.supported_languages[language]['quality_checker']
             
-            elif language == 'javascript':
-                # Use ESLint for JavaScript code quality
-                result = subprocess.run(
-                    ['eslint', '--format=json', file_path],
-                    capture_output=True,
-                    text=True,
-                    timeout=30
-                )
-                
-                if result.stdout:
-                    try:
-                        eslint_results = json.loads(result.stdout)
-                        for file_result in eslint_results:
-                            for message in file_result.get('messages', []):
-                                severity_map = {1: "warning", 2: "error"}
-                                severity = severity_map.get(message.get('severity', 1), "info")
-                                
-                                if severity == "error":
-                                    score_deduction += 5
-                                else:
-                                    score_deduction += 2
-                                
-                                issues.append({
-                                    "severity": severity,
-                                    "message": message.get('message', ''),
-                                    "file": file_info["name"],
-                                    "line": message.get('line'),
-                                    "rule": message.get('ruleId', 'eslint')
-                                })
-                    except json.JSONDecodeError:
-                        pass  # ESLint might not return valid JSON if no issues
+            for finding in await quality_checker(source, file_path, file_info, cpu_result):
+                score_deduction += 5 if finding["severity"] == "error" else 2
+                issues.append({**finding, "file": file_info["name"]})
             
             return {
                 "issues": issues,
                 "score_deduction": min(score_deduction, 30)  # Cap at 30 points
             }
             
-        except subprocess.TimeoutExpired:
+        except asyncio.TimeoutError:
             return {
                 "issues": [{
                     "severity": "warning",
@@ -286,80 +666,89 @@ class CodeValidator:
                 "score_deduction": 0
             }
     
-    async def _analyze_code_security(self, file_path: str, language: str, file_info: Dict) -> Dict[str, Any]:
+    async def _python_quality_findings(self, source: str, file_path: str, file_info: Dict,
+                                       cpu_result: Dict) -> List[Dict[str, Any]]:
+        """Quality findings collected during the shared AST pass"""
+        return (cpu_result["analysis"] or {}).get("quality_issues", [])
+    
+    async def _run_flake8(self, source: str, file_path: str, file_info: Dict,
+                          cpu_result: Dict) -> List[Dict[str, Any]]:
+        """Use Flake8 for Python code quality"""
+        findings = []
+        if self.executor is None:
+            # No pool: run flake8 as a child process so it can't block the event loop
+            result = await self._run_command(['flake8', FLAKE8_FORMAT, file_path], timeout=30)
+            report = result["stdout"]
+        else:
+            report = await self._run_in_pool(_flake8_report, file_path, timeout=30)
+        
+        # Parse flake8 output; the message is the only field that may contain ':'
+        for line in report.strip().split('\n'):
+            if line:
+                parts = line.split(':', 3)
+                if len(parts) == 4:
+                    line_num, column, code, message = parts
+                    
+                    severity = "warning"
+                    if any(error_code in code for error_code in ['E9', 'F']):
+                        severity = "error"
+                    
+                    findings.append({
+                        "severity": severity,
+                        "message": f"{code}: {message.strip()}",
+                        "line": int(line_num) if line_num.isdigit() else None,
+                        "rule": "flake8"
+                    })
+        
+        return findings
+    
+    async def _run_eslint(self, source: str, file_path: str, file_info: Dict,
+                          cpu_result: Dict) -> List[Dict[str, Any]]:
+        """Use ESLint for JavaScript code quality, linting the source from stdin"""
+        findings = []
+        result = await self._run_command(
+            [self.eslint_command, '--format=json', '--stdin', '--stdin-filename', file_info["name"]],
+            input=source
+        )
+        
+        if result["stdout"]:
+            try:
+                eslint_results = orjson.loads(result["stdout"])
+            except orjson.JSONDecodeError:
+                return findings  # ESLint might not return valid JSON if no issues
+            
+            severity_map = {1: "warning", 2: "error"}
+            for file_result in eslint_results:
+                for message in file_result.get('messages', []):
+                    findings.append({
+                        "severity": severity_map.get(message.get('severity', 1), "info"),
+                        "message": message.get('message', ''),
+                        "line": message.get('line'),
+                        "rule": message.get('ruleId', 'eslint')
+                    })
+        
+        return findings
+    
+    async def _analyze_code_security(self, source: str, file_path: str, language: str, file_info: Dict,
+                                     cpu_result: Dict) -> Dict[str, Any]:
         """Analyze code for security issues"""
         issues = []
         score_deduction = 0
+        deductions = {"error": 15, "warning": 8, "info": 3}
         
         try:
-            if language == 'python':
-                # Use Bandit for Python security analysis
-                result = subprocess.run(
-                    ['bandit', '-f', 'json', file_path],
-                    capture_output=True,
-                    text=True,
-                    timeout=30
-                )
-                
-                if result.stdout:
-                    try:
-                        bandit_results = json.loads(result.stdout)
-                        for issue in bandit_results.get('results', []):
-                            severity_map = {"LOW": "info", "MEDIUM": "warning", "HIGH": "error"}
-                            severity = severity_map.get(issue.get('issue_severity', 'LOW'), "info")
-                            
-                            if severity == "error":
-                                score_deduction += 15
-                            elif severity == "warning":
-                                score_deduction += 8
-                            else:
-                                score_deduction += 3
-                            
-                            issues.append({
-                                "severity": severity,
-                                "message": f"{issue.get('issue_text', '')}: {issue.get('test_name', '')}",
-                                "file": file_info["name"],
-                                "line": issue.get('line_number'),
-                                "rule": f"bandit-{issue.get('test_id', '')}"
-                            })
-                    except json.JSONDecodeError:
-                        pass  # Bandit might not return valid JSON if no issues
+            security_checker = self.supported_languages[language]['security_checker']
             
-            elif language == 'javascript':
-                # Basic security pattern matching for JavaScript (since ESLint security plugin might not be available)
-                with open(file_path, 'r', encoding='utf-8') as f:
-                    content = f.read()
-                
-                # Common JavaScript security issues
-                security_patterns = [
-                    (r'eval\s*\(', "Use of eval() detected", "error"),
-                    (r'innerHTML\s*=', "Potential XSS with innerHTML", "warning"),
-                    (r'document\.write\s*\(', "Use of document.write detected", "warning"),
-                    (r'setTimeout\s*\(\s*["\']', "setTimeout with string argument", "warning"),
-                    (r'setInterval\s*\(\s*["\']', "setInterval with string argument", "warning")
-                ]
-                
-                for pattern, message, sev in security_patterns:
-                    matches = re.findall(pattern, content, re.IGNORECASE)
-                    if matches:
-                        if sev == "error":
-                            score_deduction += 15
-                        elif sev == "warning":
-                            score_deduction += 8
-                        
-                        issues.append({
-                            "severity": sev,
-                            "message": f"{message} ({len(matches)} occurrences)",
-                            "file": file_info["name"],
-                            "rule": "js_security_pattern"
-                        })
+            for finding in await security_checker(source, file_path, file_info, cpu_result):
+                score_deduction += deductions.get(finding["severity"], 0)
+                issues.append({**finding, "file": file_info["name"]})
             
             return {
                 "issues": issues,
                 "score_deduction": min(score_deduction, 40)  # Cap at 40 points
             }
             
-        except subprocess.TimeoutExpired:
+        except asyncio.TimeoutError:
             return {
                 "issues": [{
                     "severity": "warning",
@@ -380,29 +769,49 @@ class CodeValidator:
                 "score_deduction": 0
             }
     
-    async def _analyze_complexity(self, file_path: str, language: str, file_info: Dict) -> Dict[str, Any]:
+    async def _python_security_findings(self, source: str, file_path: str, file_info: Dict,
+                                        cpu_result: Dict) -> List[Dict[str, Any]]:
+        """Security findings collected during the shared AST pass"""
+        return (cpu_result["analysis"] or {}).get("security_issues", [])
+    
+    async def _run_bandit(self, source: str, file_path: str, file_info: Dict,
+                          cpu_result: Dict) -> List[Dict[str, Any]]:
+        """Use Bandit's scanner for Python security analysis"""
+        severity_map = {"LOW": "info", "MEDIUM": "warning", "HIGH": "error"}
+        if self.executor is None:
+            # No pool: run bandit as a child process; its JSON results have the same shape
+            result = await self._run_command(['bandit', '-f', 'json', '-q', file_path], timeout=30)
+            bandit_results = orjson.loads(result["stdout"]).get('results', []) if result["stdout"] else []
+        else:
+            bandit_results = await self._run_in_pool(_bandit_results, file_path, timeout=30)
+        
+        return [{
+            "severity": severity_map.get(issue.get('issue_severity', 'LOW'), "info"),
+            "message": f"{issue.get('issue_text', '')}: {issue.get('test_name', '')}",
+            "line": issue.get('line_number'),
+            "rule": f"bandit-{issue.get('test_id', '')}"
+        } for issue in bandit_results]
+    
+    async def _javascript_security_findings(self, source: str, file_path: str, file_info: Dict,
+                                            cpu_result: Dict) -> List[Dict[str, Any]]:
+        """
+        Basic security pattern matching for JavaScript (since ESLint security
+        plugin might not be available)
+        """
+        return [{
+            "severity": severity,
+            "message": f"{message} ({occurrences} occurrences)",
+            "rule": "js_security_pattern"
+        } for message, severity, occurrences in cpu_result["js_security"]]
+    
+    async def _analyze_complexity(self, metrics: Dict[str, int], file_info: Dict) -> Dict[str, Any]:
         """Analyze code complexity and best practices"""
         issues = []
         score_deduction = 0
         
         try:
-            with open(file_path, 'r', encoding='utf-8') as f:
-                content = f.read()
-            
-            lines = content.split('\n')
-            line_count = len(lines)
-            non_empty_lines = len([line for line in lines if line.strip()])
-            
-            # Basic complexity metrics
-            if language == 'python':
-                # Count functions and classes
-                function_count = len(re.findall(r'^def\s+\w+', content, re.MULTILINE))
-                class_count = len(re.findall(r'^class\s+\w+', content, re.MULTILINE))
-                
-            elif language == 'javascript':
-                # Count functions
-                function_count = len(re.findall(r'function\s+\w+|const\s+\w+\s*=.*?=>|\w+\s*:\s*function', content))
-                class_count = len(re.findall(r'class\s+\w+', content))
+            line_count = metrics["line_count"]
+            non_empty_lines = metrics["non_empty_lines"]
             
             # File size analysis
             if line_count > 500:
@@ -414,17 +823,9 @@ class CodeValidator:
                 })
                 score_deduction += 3
             
-            # Documentation analysis
-            if language == 'python':
-                docstring_count = len(re.findall(r'""".*?"""', content, re.DOTALL))
-                comment_count = len(re.findall(r'#.*$', content, re.MULTILINE))
-            elif language == 'javascript':
-                docstring_count = len(re.findall(r'/\*\*.*?\*/', content, re.DOTALL))
-                comment_count = len(re.findall(r'//.*$', content, re.MULTILINE))
-            
             # Documentation ratio (rough measure of code quality)
             if non_empty_lines > 20:  # Only check for longer files
-                doc_ratio = (docstring_count + comment_count) / non_empty_lines
+                doc_ratio = (metrics["docstring_count"] + metrics["comment_count"]) / non_empty_lines
                 if doc_ratio < 0.1:  # Less than 10% documentation
                     issues.append({
                         "severity": "info",
@@ -1,4 +1,54 @@
+from functools import lru_cache
 from typing import Dict, List
+import numpy as np
+
+@lru_cache(maxsize=4096)
+def _adjust_confidence(security_score: float, technical_score: float, all_high: bool, base_score: float) -> float:
+    """Memoized kernel of ConfidenceScorer._apply_confidence_adjustments"""
+    adjusted_score = base_score
+    
+    # Security is critical - major penalties for low security scores
+    if security_score < 50:
+        adjusted_score *= 0.3  # Severe penalty for security issues
+    elif security_score < 70:
+        adjusted_score *= 0.7  # Moderate penalty
+    
+    # Technical quality threshold
+    if technical_score < 30:
+        adjusted_score *= 0.5  # Penalty for very poor code quality
+    
+    # Bonus for high performance across all categories
+    if all_high:
+        adjusted_score = min(100, adjusted_score * 1.05)  # 5% bonus
+    
+    return adjusted_score
+
+@lru_cache(maxsize=101)
+def _confidence_category(confidence_score: int) -> str:
+    """Memoized kernel of ConfidenceScorer.get_confidence_category"""
+    if confidence_score >= 85:
+        return "high"
+    elif confidence_score >= 70:
+        return "medium"
+    elif confidence_score >= 50:
+        return "low"
+    else:
+        return "very_low"
+
+@lru_cache(maxsize=4096)
+def _score_kernel(security: float, technical_quality: float, originality: float,
+                  completeness: float, weights: tuple) -> int:
+    """Memoized calculate_overall_confidence for a score dict holding exactly the four categories"""
+    w_security, w_technical, w_originality, w_completeness = weights
+    # Same accumulation order as the generic loop, so results round identically
+    weighted_score = security * w_security + technical_quality * w_technical
+    weighted_score += originality * w_originality
+    weighted_score += completeness * w_completeness
+    final_score = weighted_score / (w_security + w_technical + w_originality + w_completeness)
+    
+    all_high = min(security, technical_quality, originality, completeness) >= 85
+    adjusted_score = _adjust_confidence(security, technical_quality, all_high, final_score)
+    return max(0, min(100, round(adjusted_score)))
 
 class ConfidenceScorer:
     def __init__(self):
@@ -9,12 +59,25 @@ class ConfidenceScorer:
             "originality": 0.20,     # 20% - Plagiarism/uniqueness
             "completeness": 0.15     # 15% - Meeting requirements
         }
+        # Fixed column order for batch scoring
+        self.categories = ["security", "technical_quality", "originality", "completeness"]
+        self._weights_vec = np.array([self.weights[c] for c in self.categories], dtype=np.float64)
+        self._total_weight = sum(self.weights[c] for c in self.categories)
+        self._weights_tuple = tuple(self.weights[c] for c in self.categories)
     
     def calculate_overall_confidence(self, scores: Dict[str, float]) -> int:
         """
         Calculate overall confidence score (0-100) from category scores
         """
         try:
+            # Full-schema dicts (the common case) go through the cached kernel
+            if scores.keys() == self.weights.keys():
+                return _score_kernel(
+                    scores["security"], scores["technical_quality"],
+                    scores["originality"], scores["completeness"],
+                    self._weights_tuple
+                )
+            
             weighted_score = 0
             total_weight = 0
             
@@ -39,42 +102,50 @@ class ConfidenceScorer:
         except Exception:
             return 50  # Default neutral score if calculation fails
     
-    def _apply_confidence_adjustments(self, scores: Dict[str, float], base_score: float) -> float:
+    def calculate_overall_confidence_batch(self, scores_array: np.ndarray) -> np.ndarray:
         """
-        Apply additional adjustments to confidence score based on specific criteria
+        Vectorized calculate_overall_confidence for an (N, 4) score matrix whose
+        columns follow self.categories. Every category must be present.
         """
-        adjusted_score = base_score
+        scores_array = np.asarray(scores_array, dtype=np.float64)
+        if scores_array.ndim != 2 or scores_array.shape[1] != len(self.categories):
+            raise ValueError(f"Expected an (N, {len(self.categories)}) score matrix, got {scores_array.shape}")
         
-        # Security is critical - major penalties for low security scores
-        security_score = scores.get("security", 100)
-        if security_score < 50:
-            adjusted_score *= 0.3  # Severe penalty for security issues
-        elif security_score < 70:
-            adjusted_score *= 0.7  # Moderate penalty
+        # Accumulate column by column and normalize like the scalar path, so
+        # results round identically at .5 boundaries
+        weighted = np.zeros(scores_array.shape[0])
+        for column, weight in enumerate(self._weights_vec):
+            weighted += scores_array[:, column] * weight
+        weighted /= self._total_weight
         
-        # Technical quality threshold
-        technical_score = scores.get("technical_quality", 100)
-        if technical_score < 30:
-            adjusted_score *= 0.5  # Penalty for very poor code quality
+        # Same penalties as _apply_confidence_adjustments
+        security = scores_array[:, 0]
+        technical = scores_array[:, 1]
+        weighted *= np.where(security < 50, 0.3, np.where(security < 70, 0.7, 1.0))
+        weighted *= np.where(technical < 30, 0.5, 1.0)
         
         # Bonus for high performance across all categories
-        if all(score >= 85 for score in scores.values()):
-            adjusted_score = min(100, adjusted_score * 1.05)  # 5% bonus
+        bonus = scores_array.min(axis=1) >= 85
+        weighted = np.where(bonus, np.minimum(100, weighted * 1.05), weighted)
         
-        return adjusted_score
+        return np.clip(weighted, 0, 100).round().astype(np.int32)
+    
+    def _apply_confidence_adjustments(self, scores: Dict[str, float], base_score: float) -> float:
+        """
+        Apply additional adjustments to confidence score based on specific criteria
+        """
+        return _adjust_confidence(
+            scores.get("security", 100),
+            scores.get("technical_quality", 100),
+            min(scores.values(), default=0) >= 85,
+            base_score
+        )
     
     def get_confidence_category(self, confidence_score: int) -> str:
         """
         Categorize confidence score into human-readable categories
         """
-        if confidence_score >= 85:
-            return "high"
-        elif confidence_score >= 70:
-            return "medium"
-        elif confidence_score >= 50:
-            return "low"
-        else:
-            return "very_low"
+        return _confidence_category(confidence_score)
     
     def get_recommendation_reason(self, scores: Dict[str, float], issues: List[Dict]) -> str:
         """
@@ -83,12 +154,19 @@ class ConfidenceScorer:
         try:
             reasons = []
             
+            # Classify issues in one pass
+            error_count = 0
+            critical_security_count = 0
+            for issue in issues:
+                if issue.get("severity") == "error":
+                    error_count += 1
+                    if "security" in issue.get("rule", "").lower():
+                        critical_security_count += 1
+            
             # Security analysis
             security_score = scores.get("security", 100)
             if security_score < 70:
-                critical_security_issues = [issue for issue in issues 
-                                           if issue.get("severity") == "error" and "security" in issue.get("rule", "").lower()]
-                if critical_security_issues:
+                if critical_security_count:
                     reasons.append("Critical security vulnerabilities detected")
                 else:
                     reasons.append("Security concerns identified")
@@ -101,12 +179,11 @@ class ConfidenceScorer:
                 reasons.append("Minor code quality improvements needed")
             
             # Error analysis
-            error_count = len([issue for issue in issues if issue.get("severity") == "error"])
             if error_count > 0:
                 reasons.append(f"{error_count} critical issue(s) found")
             
             # Positive indicators
-            if all(score >= 85 for score in scores.values()):
+            if min(scores.values(), default=0) >= 85:
                 reasons.append("High quality across all criteria")
             
             return "; ".join(reasons) if reasons else "Standard validation completed"
@@ -1,14 +1,89 @@
 import clamd
-import subprocess
 import os
-import hashlib
 import re
+from collections import Counter
 from typing import Dict, List, Any
 import asyncio
+import time
+
+# Seconds a ClamAV liveness check is reused before pinging again
+AV_STATUS_TTL = 5.0
+
+# Only the head of a file is pattern-scanned; large files are not read in full
+CONTENT_SCAN_LIMIT = 4 * 1024 * 1024
+
+# Suspicious content patterns are matched against lowercased file bytes. Plain
+# substrings are tallied with bytes.count, which searches in C far faster than a
+# regex alternation; only the call patterns that allow whitespace need a regex
+_CONTENT_NEEDLES = {
+    "sysexec": (b"subprocess.", b"os.system", b"os.popen"),
+    "net": (b"socket.", b"urllib", b"requests"),
+    "b64": (b"base64.decode", b"base64.b64decode"),
+    "pickle": (b"pickle.load", b"marshal.load")
+}
+
+_CALL_PATTERN_RE = re.compile(
+    rb"(?P<eval>eval\s*\()"
+    rb"|(?P<exec>exec\s*\()"
+    rb"|(?P<dyn_import>__import__\s*\()"
+)
+
+# Group name -> (message, severity), in reporting order
+_CONTENT_PATTERN_META = {
+    "eval": ("Use of eval() function detected", "warning"),
+    "exec": ("Use of exec() function detected", "warning"),
+    "dyn_import": ("Dynamic import detected", "info"),
+    "sysexec": ("System command execution detected", "warning"),
+    "net": ("Network operation detected", "info"),
+    "b64": ("Base64 decoding detected", "info"),
+    "pickle": ("Unsafe deserialization detected", "error")
+}
+
+def _read_magic(file_path: str, size: int = 16) -> bytes:
+    """Read the leading signature bytes of a file with a single syscall"""
+    fd = os.open(file_path, os.O_RDONLY)
+    try:
+        return os.pread(fd, size, 0)
+    finally:
+        os.close(fd)
+
+def _count_content_patterns(file_path: str) -> Counter:
+    """Tally suspicious pattern hits over the first CONTENT_SCAN_LIMIT bytes of a file"""
+    with open(file_path, 'rb') as f:
+        content = f.read(CONTENT_SCAN_LIMIT).lower()
+    
+    counts = Counter(match.lastgroup for match in _CALL_PATTERN_RE.finditer(content))
+    for group, needles in _CONTENT_NEEDLES.items():
+        counts[group] = sum(content.count(needle) for needle in needles)
+    return counts
 
 class SecurityScanner:
+    # Suspicious extensions that shouldn't be in research submissions
+    DANGEROUS_EXTS = frozenset({
+        '.exe', '.bat', '.cmd', '.scr', '.pif', '.com', '.dll',
+        '.msi', '.vbs', '.ps1', '.jar', '.app', '.deb', '.rpm'
+    })
+    # Text-based files whose content is pattern-scanned
+    TEXT_EXTS = frozenset({'.py', '.js', '.ts', '.java', '.cpp', '.c', '.h', '.txt', '.md'})
+    # Code files expected to hold more than a few bytes
+    CODE_EXTS = frozenset({'.py', '.js', '.java', '.cpp'})
+    
+    # File signature -> (description, severity), looked up longest prefix first
+    DANGEROUS_MAGIC = {
+        b'MZ': ("Windows PE executable", "error"),
+        b'\x7fELF': ("ELF executable", "error"),
+        b'\xcf\xfa\xed\xfe': ("Mach-O executable", "error"),
+        b'\xce\xfa\xed\xfe': ("Mach-O executable", "error"),
+        b'\xca\xfe\xba\xbe': ("Mach-O universal binary or Java class file", "error"),
+        b'PK\x03\x04': ("ZIP archive", "warning")
+    }
+    _MAGIC_LENS = sorted({len(signature) for signature in DANGEROUS_MAGIC}, reverse=True)
+    
     def __init__(self):
         self.clamd_socket = None
+        self._av_status = "unknown"
+        self._av_status_ts = float('-inf')
+        self._av_status_lock = asyncio.Lock()
         self.initialize_clamav()
     
     def initialize_clamav(self):
@@ -22,15 +97,29 @@ class SecurityScanner:
             print(f"⚠️ ClamAV initialization failed: {e}")
             self.clamd_socket = None
     
-    def check_antivirus_status(self) -> str:
-        """Check if antivirus service is running"""
+    async def check_antivirus_status(self) -> str:
+        """Check if antivirus service is running, reusing the last answer for AV_STATUS_TTL seconds"""
+        if time.monotonic() - self._av_status_ts < AV_STATUS_TTL:
+            return self._av_status
+        
+        # One ping per refresh; concurrent callers wait for it instead of pinging too
+        async with self._av_status_lock:
+            if time.monotonic() - self._av_status_ts < AV_STATUS_TTL:
+                return self._av_status
+            
+            self._av_status = await self._ping_antivirus()
+            self._av_status_ts = time.monotonic()
+            return self._av_status
+    
+    async def _ping_antivirus(self) -> str:
+        """Ping clamd and report its status"""
         try:
             if self.clamd_socket:
-                self.clamd_socket.ping()
+                await asyncio.to_thread(self.clamd_socket.ping)
                 return "running"
             else:
                 return "not_connected"
-        except:
+        except Exception:
             return "error"
     
     async def scan_file(self, file_path: str, file_info: Dict) -> Dict[str, Any]:
@@ -44,27 +133,37 @@ class SecurityScanner:
             # 1. ClamAV virus scan
             virus_result = await self._scan_with_clamav(file_path)
             if virus_result["infected"]:
+                # Score is already at the floor; skip the remaining checks entirely
                 issues.append({
                     "severity": "error",
                     "message": f"Malware detected: {virus_result['virus']}",
                     "file": file_info["name"],
                     "rule": "clamav_scan"
                 })
-                security_score = 0  # Critical security failure
+                return {
+                    "score": 0,
+                    "issues": issues,
+                    "scan_completed": True
+                }
+            
+            # The remaining checks are independent, so run them concurrently; their
+            # blocking I/O happens in worker threads
+            file_type_result, content_result, structure_result = await asyncio.gather(
+                self._validate_file_type(file_path, file_info),
+                self._scan_file_content(file_path, file_info),
+                self._validate_file_structure(file_path, file_info)
+            )
             
             # 2. File type validation
-            file_type_result = self._validate_file_type(file_path, file_info)
             if file_type_result["suspicious"]:
                 issues.extend(file_type_result["issues"])
                 security_score -= 20
             
             # 3. Content-based security checks
-            content_result = await self._scan_file_content(file_path, file_info)
             issues.extend(content_result["issues"])
             security_score -= content_result["score_deduction"]
             
             # 4. File size and structure checks
-            structure_result = self._validate_file_structure(file_path, file_info)
             issues.extend(structure_result["issues"])
             security_score -= structure_result["score_deduction"]
             
@@ -97,23 +196,24 @@ class SecurityScanner:
             if not self.clamd_socket:
                 return {"infected": False, "virus": None, "error": "ClamAV not available"}
             
-            result = self.clamd_socket.scan(file_path)
+            result = await asyncio.to_thread(self.clamd_socket.scan, file_path)
             
             if result is None:
                 return {"infected": False, "virus": None}
             
-            # ClamAV returns (filename, status) if infected
-            filename, status = list(result.items())[0]
-            if "FOUND" in status:
-                virus_name = status.replace(" FOUND", "")
+            # clamd maps each scanned path to a (status, virus_name) tuple
+            filename, (status, virus_name) = next(iter(result.items()))
+            if status == "FOUND":
                 return {"infected": True, "virus": virus_name}
+            if status == "ERROR":
+                return {"infected": False, "virus": None, "error": virus_name}
             
             return {"infected": False, "virus": None}
             
         except Exception as e:
             return {"infected": False, "virus": None, "error": str(e)}
     
-    def _validate_file_type(self, file_path: str, file_info: Dict) -> Dict[str, Any]:
+    async def _validate_file_type(self, file_path: str, file_info: Dict) -> Dict[str, Any]:
         """Validate file type and extension"""
         issues = []
         suspicious = False
@@ -122,13 +222,7 @@ class SecurityScanner:
             # Check file extension against content
             file_extension = os.path.splitext(file_info["name"])[1].lower()
             
-            # Suspicious extensions that shouldn't be in research submissions
-            dangerous_extensions = [
-                '.exe', '.bat', '.cmd', '.scr', '.pif', '.com', '.dll',
-                '.msi', '.vbs', '.ps1', '.jar', '.app', '.deb', '.rpm'
-            ]
-            
-            if file_extension in dangerous_extensions:
+            if file_extension in self.DANGEROUS_EXTS:
                 issues.append({
                     "severity": "error",
                     "message": f"Dangerous file type not allowed: {file_extension}",
@@ -137,21 +231,24 @@ class SecurityScanner:
                 })
                 suspicious = True
             
-            # Check file signature (magic numbers)
-            with open(file_path, 'rb') as f:
-                file_signature = f.read(16)
+            # Check file signature (magic numbers); uploads carry the leading bytes
+            # captured while they were written, so only read them if missing
+            file_signature = file_info.get("magic")
+            if file_signature is None:
+                file_signature = await asyncio.to_thread(_read_magic, file_path)
             
-            # Basic file signature validation
-            if len(file_signature) >= 2:
-                # Check for executable signatures
-                if file_signature[:2] == b'MZ':  # Windows PE executable
+            for length in self._MAGIC_LENS:
+                match = self.DANGEROUS_MAGIC.get(file_signature[:length])
+                if match is not None:
+                    description, severity = match
                     issues.append({
-                        "severity": "error",
-                        "message": "Executable file detected by signature",
+                        "severity": severity,
+                        "message": f"{description} detected by signature",
                         "file": file_info["name"],
                         "rule": "file_signature_check"
                     })
                     suspicious = True
+                    break
             
             return {
                 "suspicious": suspicious,
@@ -178,32 +275,18 @@ class SecurityScanner:
         
         try:
             # Only scan text-based files
-            text_extensions = ['.py', '.js', '.ts', '.java', '.cpp', '.c', '.h', '.txt', '.md']
             file_extension = os.path.splitext(file_info["name"])[1].lower()
             
-            if file_extension not in text_extensions:
+            if file_extension not in self.TEXT_EXTS:
                 return {"issues": issues, "score_deduction": score_deduction}
             
-            with open(file_path, 'r', encoding='utf-8', errors='ignore') as f:
-                content = f.read()
-            
-            # Suspicious patterns to look for
-            suspicious_patterns = [
-                (r'eval\s*\(', "Use of eval() function detected", "warning"),
-                (r'exec\s*\(', "Use of exec() function detected", "warning"),
-                (r'__import__\s*\(', "Dynamic import detected", "info"),
-                (r'subprocess\.|os\.system|os\.popen', "System command execution detected", "warning"),
-                (r'socket\.|urllib|requests', "Network operation detected", "info"),
-                (r'base64\.decode|base64\.b64decode', "Base64 decoding detected", "info"),
-                (r'pickle\.loads?|marshal\.loads?', "Unsafe deserialization detected", "error")
-            ]
-            
-            for pattern, message, severity in suspicious_patterns:
-                matches = re.findall(pattern, content, re.IGNORECASE)
-                if matches:
+            counts = await asyncio.to_thread(_count_content_patterns, file_path)
+            
+            for group, (message, severity) in _CONTENT_PATTERN_META.items():
+                if counts[group]:
                     issues.append({
                         "severity": severity,
-                        "message": f"{message} ({len(matches)} occurrences)",
+                        "message": f"{message} ({counts[group]} occurrences)",
                         "file": file_info["name"],
                         "rule": "content_pattern_scan"
                     })
@@ -233,13 +316,13 @@ class SecurityScanner:
                 "score_deduction": 5
             }
     
-    def _validate_file_structure(self, file_path: str, file_info: Dict) -> Dict[str, Any]:
+    async def _validate_file_structure(self, file_path: str, file_info: Dict) -> Dict[str, Any]:
         """Validate file structure and metadata"""
         issues = []
         score_deduction = 0
         
         try:
-            file_stats = os.stat(file_path)
+            file_stats = await asyncio.to_thread(os.stat, file_path)
             file_size = file_stats.st_size
             
             # Check for suspiciously large files (>100MB)
@@ -253,10 +336,9 @@ class SecurityScanner:
                 score_deduction += 5
             
             # Check for suspiciously small files that claim to be code (might be malformed)
-            code_extensions = ['.py', '.js', '.java', '.cpp']
             file_extension = os.path.splitext(file_info["name"])[1].lower()
             
-            if file_extension in code_extensions and file_size < 10:
+            if file_extension in self.CODE_EXTS and file_size < 10:
                 issues.append({
                     "severity": "info",
                     "message": "Very small code file detected",
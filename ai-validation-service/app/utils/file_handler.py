@@ -1,15 +1,59 @@
 import os
+import stat
+import shutil
 import hashlib
 import tempfile
 import aiofiles
-from typing import Dict, Any, Optional
+from typing import AsyncIterable, Dict, Any, Optional
 from pathlib import Path
 
+# Chunk size for hashing and writing uploads in one pass
+HASH_CHUNK_SIZE = 1 << 20
+
+SAFE_FILENAME_CHARS = "abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ0123456789.-_"
+
+class _FilenameTable(dict):
+    """str.translate table that keeps safe characters and maps every other codepoint to '_'"""
+    def __missing__(self, codepoint: int) -> str:
+        return '_'
+
+_FILENAME_TABLE = _FilenameTable({ord(c): c for c in SAFE_FILENAME_CHARS})
+
+# Leading bytes of each upload kept for signature checks
+MAGIC_BYTES = 16
+
+class FileTooLargeError(ValueError):
+    """Upload exceeds FileHandler.max_file_size"""
+
 class FileHandler:
     def __init__(self):
         self.max_file_size = 100 * 1024 * 1024  # 100MB
         self.temp_dir = Path(tempfile.gettempdir()) / "viera_validation"
         self.temp_dir.mkdir(exist_ok=True)
+        # Optional RAM-backed directory for uploads (see use_scratch_dir)
+        self.scratch_dir = None
+        # Scratch bytes promised to uploads still being written
+        self._scratch_reserved = 0
+    
+    def use_scratch_dir(self, path: str):
+        """Write uploads under a RAM-backed directory such as /dev/shm while it has room"""
+        scratch_dir = Path(path) / "viera_validation"
+        scratch_dir.mkdir(exist_ok=True)
+        self.scratch_dir = scratch_dir
+    
+    def _reserve_upload_dir(self) -> tuple:
+        """
+        Pick the directory for a new upload. Scratch space is used only if it can
+        hold a max-size upload on top of those already being written; the size
+        isn't known up front, so each in-flight upload reserves max_file_size
+        until it is complete. Returns (directory, reserved bytes)
+        """
+        if self.scratch_dir is not None:
+            free = shutil.disk_usage(self.scratch_dir).free - self._scratch_reserved
+            if free >= self.max_file_size:
+                self._scratch_reserved += self.max_file_size
+                return self.scratch_dir, self.max_file_size
+        return self.temp_dir, 0
     
     async def save_uploaded_file(self, file_content: bytes, filename: str) -> str:
         """
@@ -17,30 +61,69 @@ class FileHandler:
         """
         # Validate file size
         if len(file_content) > self.max_file_size:
-            raise ValueError(f"File too large: {len(file_content)} bytes (max: {self.max_file_size})")
+            raise FileTooLargeError(f"File too large: {len(file_content)} bytes (max: {self.max_file_size})")
+        
+        async def chunks():
+            view = memoryview(file_content)
+            for offset in range(0, len(view), HASH_CHUNK_SIZE):
+                yield view[offset:offset + HASH_CHUNK_SIZE]
         
-        # Generate unique filename
-        file_hash = hashlib.md5(file_content).hexdigest()[:8]
+        return (await self.save_uploaded_stream(chunks(), filename))["path"]
+    
+    async def save_uploaded_stream(self, stream: AsyncIterable[bytes], filename: str) -> Dict[str, Any]:
+        """
+        Stream an upload to a temporary location, aborting as soon as it exceeds
+        max_file_size. Returns its path, size and leading magic bytes
+        """
+        # Temp name is tagged with a short content hash, computed while the
+        # bytes are written so the upload is only walked once
         safe_filename = self._sanitize_filename(filename)
-        temp_filename = f"{file_hash}_{safe_filename}"
-        temp_path = self.temp_dir / temp_filename
+        upload_dir, reserved = self._reserve_upload_dir()
+        try:
+            fd, partial_path = tempfile.mkstemp(dir=upload_dir, suffix=f"_{safe_filename}")
+        except BaseException:
+            self._scratch_reserved -= reserved
+            raise
+        os.close(fd)
+        hasher = hashlib.blake2b(digest_size=4)
+        total = 0
+        magic = b""
         
-        # Save file
-        async with aiofiles.open(temp_path, 'wb') as f:
-            await f.write(file_content)
+        try:
+            async with aiofiles.open(partial_path, 'wb') as f:
+                async for chunk in stream:
+                    total += len(chunk)
+                    if total > self.max_file_size:
+                        raise FileTooLargeError(f"File too large: {filename} is over {self.max_file_size} bytes")
+                    if len(magic) < MAGIC_BYTES:
+                        magic += bytes(chunk[:MAGIC_BYTES - len(magic)])
+                    hasher.update(chunk)
+                    await f.write(chunk)
+            
+            # Keep mkstemp's unique name behind the tag so identical uploads don't collide
+            temp_path = upload_dir / f"{hasher.hexdigest()}_{os.path.basename(partial_path)}"
+            os.replace(partial_path, temp_path)
+        except BaseException:
+            if os.path.exists(partial_path):
+                os.unlink(partial_path)
+            raise
+        finally:
+            # Written bytes now show up in the filesystem's own free space
+            self._scratch_reserved -= reserved
         
-        return str(temp_path)
+        return {
+            "path": str(temp_path),
+            "size": total,
+            "magic": magic
+        }
     
     def _sanitize_filename(self, filename: str) -> str:
         """
         Sanitize filename to prevent path traversal attacks
         """
-        # Remove directory separators and other dangerous characters
-        safe_chars = "abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ0123456789.-_"
-        sanitized = ''.join(c if c in safe_chars else '_' for c in filename)
-        
-        # Limit length and ensure it's not empty
-        sanitized = sanitized[:100]  # Max 100 characters
+        # Remove directory separators and other dangerous characters; limit
+        # length and ensure it's not empty
+        sanitized = filename.translate(_FILENAME_TABLE)[:100]
         if not sanitized:
             sanitized = "unknown_file"
         
@@ -51,7 +134,8 @@ class FileHandler:
         Clean up temporary file
         """
         try:
-            if os.path.exists(file_path) and str(file_path).startswith(str(self.temp_dir)):
+            managed_dirs = [str(d) for d in (self.temp_dir, self.scratch_dir) if d is not None]
+            if os.path.exists(file_path) and str(file_path).startswith(tuple(managed_dirs)):
                 os.unlink(file_path)
                 return True
         except Exception:
@@ -63,12 +147,12 @@ class FileHandler:
         Get basic information about a file
         """
         try:
-            stat = os.stat(file_path)
+            st = os.stat(file_path)
             return {
-                "size_bytes": stat.st_size,
-                "modified_time": stat.st_mtime,
-                "is_file": os.path.isfile(file_path),
-                "extension": Path(file_path).suffix.lower()
+                "size_bytes": st.st_size,
+                "modified_time": st.st_mtime,
+                "is_file": stat.S_ISREG(st.st_mode),
+                "extension": os.path.splitext(file_path)[1].lower()
             }
         except Exception as e:
             return {